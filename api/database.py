@@ -1,7 +1,11 @@
 """
 Database module for storing capture runs and leads
 """
+import atexit
 import sqlite3
+import threading
+import weakref
+from itertools import chain
 from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime
@@ -11,19 +15,134 @@ import json
 # Database file path
 DB_PATH = Path(__file__).parent / "capture_runs.db"
 
+# STRICT tables need SQLite 3.37+, INSERT ... RETURNING needs 3.35+ - older
+# bundled libraries fall back to a plain table and cursor.lastrowid
+_SQLITE_HAS_STRICT = sqlite3.sqlite_version_info >= (3, 37, 0)
+_SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# run_leads is clustered on its natural key; position keeps the capture order
+_RUN_LEADS_TABLE_DEFINITION = """(
+    run_id INTEGER NOT NULL,
+    lead_id TEXT NOT NULL,
+    position INTEGER NOT NULL DEFAULT 0,
+    name TEXT NOT NULL,
+    title TEXT,
+    company TEXT,
+    location TEXT,
+    match_score INTEGER DEFAULT 0,
+    description TEXT,
+    linkedin_url TEXT NOT NULL,
+    email TEXT,
+    profile_image TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    is_selected INTEGER DEFAULT 0,
+    PRIMARY KEY (run_id, lead_id),
+    FOREIGN KEY (run_id) REFERENCES runs(id) ON DELETE CASCADE
+)""" + (" STRICT, WITHOUT ROWID" if _SQLITE_HAS_STRICT else " WITHOUT ROWID")
+
+# Leads per multi-row INSERT (13 columns x 76 rows stays under SQLite's 999 parameter limit)
+LEAD_INSERT_CHUNK_SIZE = 76
+_LEAD_ROW_PLACEHOLDER = "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+_INSERT_LEADS_SQL = """
+    INSERT INTO run_leads (
+        run_id, lead_id, position, name, title, company, location,
+        match_score, description, linkedin_url, email,
+        profile_image, is_selected
+    ) VALUES {values}
+"""
+# Full chunks reuse one SQL string so they hit the connection's statement cache
+_INSERT_LEADS_CHUNK_SQL = _INSERT_LEADS_SQL.format(
+    values=", ".join([_LEAD_ROW_PLACEHOLDER] * LEAD_INSERT_CHUNK_SIZE)
+)
+
+# Bump when init_database() gains new tables, columns or indexes
+SCHEMA_VERSION = 4
+
+# Set once WAL has been enabled (journal_mode is persistent in the database file)
+_initialized = False
+
+# One connection per thread, reused across calls to keep SQLite's page cache warm
+_local = threading.local()
+# Weak references only, so a thread's connection can close once the thread is gone
+_connections = weakref.WeakSet()
+_connections_lock = threading.Lock()
+
+
+def _close_connection(conn):
+    """Close a shared connection, refreshing planner statistics first"""
+    try:
+        # Refresh planner statistics that have drifted since they were last gathered
+        conn.execute("PRAGMA optimize")
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+
+class _ThreadConnection:
+    """Holds one thread's connection and closes it when the thread exits and its locals are dropped"""
+    
+    def __init__(self, conn):
+        self.conn = conn
+        self.close = weakref.finalize(self, _close_connection, conn)
+
 
 def get_db_connection():
-    """Get a database connection"""
-    conn = sqlite3.connect(DB_PATH)
+    """Get the calling thread's shared database connection"""
+    global _initialized
+    
+    holder = getattr(_local, "holder", None)
+    if holder is not None:
+        return holder.conn
+    
+    # isolation_level=None: write paths manage their own transactions explicitly
+    # check_same_thread=False so it can be closed from whichever thread drops it, or at exit
+    conn = sqlite3.connect(
+        DB_PATH,
+        isolation_level=None,
+        check_same_thread=False,
+        cached_statements=256
+    )
     conn.row_factory = sqlite3.Row  # Enable column access by name
+    
+    # WAL lets readers run alongside a writer and avoids a journal fsync per commit
+    if not _initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        _initialized = True
+    
+    # Per-connection settings
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")  # ~64 MB page cache
+    conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+    conn.execute("PRAGMA foreign_keys=ON")  # Required for ON DELETE CASCADE
+    
+    holder = _ThreadConnection(conn)
+    _local.holder = holder
+    with _connections_lock:
+        _connections.add(holder)
     return conn
 
 
+def close_db_connections():
+    """Close all shared database connections"""
+    with _connections_lock:
+        holders = list(_connections)
+        _connections.clear()
+    for holder in holders:
+        holder.close()
+
+
+atexit.register(close_db_connections)
+
+
 def init_database():
     """Initialize the database by creating tables if they don't exist"""
     conn = get_db_connection()
     cursor = conn.cursor()
     
+    # Schema version this database was last initialized at (0 for new or pre-versioning files)
+    previous_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+    
     # Create users table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS users (
@@ -71,34 +190,52 @@ def init_database():
     except sqlite3.OperationalError:
         pass  # Column already exists
     
+    # Add user_id column to runs table if it doesn't exist (migration)
+    # Must run before idx_runs_user_id is created below
+    try:
+        cursor.execute("ALTER TABLE runs ADD COLUMN user_id INTEGER")
+    except sqlite3.OperationalError:
+        pass  # Column already exists
+    
+    # Migrate run_leads from the old rowid layout (id + UNIQUE(run_id, lead_id))
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'run_leads'")
+    row = cursor.fetchone()
+    if row and "WITHOUT ROWID" not in row[0]:
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            cursor.execute(f"CREATE TABLE run_leads_v2 {_RUN_LEADS_TABLE_DEFINITION}")
+            cursor.execute("""
+                INSERT INTO run_leads_v2 (
+                    run_id, lead_id, position, name, title, company, location,
+                    match_score, description, linkedin_url, email,
+                    profile_image, created_at, is_selected
+                )
+                SELECT
+                    run_id, lead_id, id, name, title, company, location,
+                    CAST(match_score AS INTEGER), description, linkedin_url, email,
+                    profile_image, created_at, is_selected
+                FROM run_leads
+                WHERE run_id IN (SELECT id FROM runs)  -- drop leads orphaned by deletes made without foreign_keys
+            """)
+            cursor.execute("DROP TABLE run_leads")
+            cursor.execute("ALTER TABLE run_leads_v2 RENAME TO run_leads")
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        print("[Database] Migrated run_leads to WITHOUT ROWID layout")
+    
     # Create run_leads table to store all leads for each run
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS run_leads (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            run_id INTEGER NOT NULL,
-            lead_id TEXT NOT NULL,
-            name TEXT NOT NULL,
-            title TEXT,
-            company TEXT,
-            location TEXT,
-            match_score INTEGER DEFAULT 0,
-            description TEXT,
-            linkedin_url TEXT NOT NULL,
-            email TEXT,
-            profile_image TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            is_selected INTEGER DEFAULT 0,
-            FOREIGN KEY (run_id) REFERENCES runs(id) ON DELETE CASCADE,
-            UNIQUE(run_id, lead_id)
-        )
-    """)
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS run_leads {_RUN_LEADS_TABLE_DEFINITION}")
     
     # Create indexes for better query performance
+    # (lookups by run_id use the run_leads primary key directly)
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_run_leads_run_id ON run_leads(run_id)
+        CREATE INDEX IF NOT EXISTS idx_run_leads_lead_id ON run_leads(lead_id)
     """)
+    # Partial index: only selected leads, already ordered for get_run_leads(selected_only=True)
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_run_leads_lead_id ON run_leads(lead_id)
+        CREATE INDEX IF NOT EXISTS idx_run_leads_selected ON run_leads(run_id, position) WHERE is_selected = 1
     """)
     cursor.execute("""
         CREATE INDEX IF NOT EXISTS idx_runs_created_at ON runs(created_at)
@@ -107,18 +244,46 @@ def init_database():
         CREATE INDEX IF NOT EXISTS idx_runs_user_id ON runs(user_id)
     """)
     
-    # Add user_id column to runs table if it doesn't exist (migration)
-    try:
-        cursor.execute("ALTER TABLE runs ADD COLUMN user_id INTEGER")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_runs_user_id ON runs(user_id)")
-    except sqlite3.OperationalError:
-        pass  # Column already exists
+    # Version 4: get_all_runs reads the counts stored on runs, but older versions stored
+    # len(selected_lead_ids) - recount both from run_leads once
+    if previous_version < 4:
+        cursor.execute("""
+            UPDATE runs SET
+                total_leads = (SELECT COUNT(*) FROM run_leads WHERE run_id = runs.id),
+                selected_leads = (SELECT COUNT(*) FROM run_leads WHERE run_id = runs.id AND is_selected = 1)
+        """)
+    
+    # Gather planner statistics for the tables and indexes above
+    cursor.execute("ANALYZE")
+    
+    # Record the schema version so later imports can skip this function
+    cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     
     conn.commit()
-    conn.close()
     print(f"[Database] Database initialized at {DB_PATH}")
 
 
+def _schema_is_current() -> bool:
+    """Check via a read-only connection whether init_database() has already run"""
+    try:
+        conn = sqlite3.connect(f"{DB_PATH.as_uri()}?mode=ro", uri=True)
+    except sqlite3.OperationalError:
+        return False  # Database file does not exist yet
+    
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.close()
+
+
+def _maybe_init():
+    """Run init_database() only when the schema is missing or out of date"""
+    if not _schema_is_current():
+        init_database()
+
+
 def create_run(
     run_label: str,
     linkedin_url: str,
@@ -147,29 +312,28 @@ def create_run(
     conn = get_db_connection()
     cursor = conn.cursor()
     
+    # Count the leads actually flagged below - selected_lead_ids may hold duplicates or unknown ids
+    selected_set = set(selected_lead_ids)
+    selected_count = sum(1 for lead in leads if lead.get('id') in selected_set)
+    
     try:
+        cursor.execute("BEGIN IMMEDIATE")
+        
         # Insert run
         cursor.execute("""
             INSERT INTO runs (run_label, linkedin_url, ai_criteria, total_leads, selected_leads, status, error_message, user_id)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (run_label, linkedin_url, ai_criteria, len(leads), len(selected_lead_ids), status, error_message, user_id))
-        
-        run_id = cursor.lastrowid
+        """ + ("RETURNING id" if _SQLITE_HAS_RETURNING else ""),
+            (run_label, linkedin_url, ai_criteria, len(leads), selected_count, status, error_message, user_id))
+        run_id = cursor.fetchone()[0] if _SQLITE_HAS_RETURNING else cursor.lastrowid
         
         # Insert all leads (only if there are leads)
         if leads:
-            for lead in leads:
-                is_selected = 1 if lead.get('id') in selected_lead_ids else 0
-                
-                cursor.execute("""
-                    INSERT INTO run_leads (
-                        run_id, lead_id, name, title, company, location,
-                        match_score, description, linkedin_url, email,
-                        profile_image, is_selected
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
+            rows = [
+                (
                     run_id,
                     lead.get('id', ''),
+                    position,
                     lead.get('name', ''),
                     lead.get('title', ''),
                     lead.get('company', ''),
@@ -179,18 +343,30 @@ def create_run(
                     lead.get('linkedin_url', ''),
                     lead.get('email'),
                     lead.get('profile_image'),
-                    is_selected
-                ))
+                    1 if lead.get('id') in selected_set else 0
+                )
+                for position, lead in enumerate(leads)
+            ]
+            
+            # Insert in multi-row chunks so SQLite parses one statement per chunk
+            for start in range(0, len(rows), LEAD_INSERT_CHUNK_SIZE):
+                chunk = rows[start:start + LEAD_INSERT_CHUNK_SIZE]
+                if len(chunk) == LEAD_INSERT_CHUNK_SIZE:
+                    sql = _INSERT_LEADS_CHUNK_SQL
+                else:
+                    sql = _INSERT_LEADS_SQL.format(
+                        values=", ".join([_LEAD_ROW_PLACEHOLDER] * len(chunk))
+                    )
+                cursor.execute(sql, list(chain.from_iterable(chunk)))
         
-        conn.commit()
-        print(f"[Database] Created run {run_id} with status '{status}' - {len(leads)} leads ({len(selected_lead_ids)} selected)")
+        cursor.execute("COMMIT")
+        print(f"[Database] Created run {run_id} with status '{status}' - {len(leads)} leads ({selected_count} selected)")
         return run_id
         
     except Exception as e:
-        conn.rollback()
+        if conn.in_transaction:
+            cursor.execute("ROLLBACK")
         raise e
-    finally:
-        conn.close()
 
 
 def create_failed_run(
@@ -232,7 +408,6 @@ def get_run(run_id: int) -> Optional[Dict]:
     run_row = cursor.fetchone()
     
     if not run_row:
-        conn.close()
         return None
     
     run = dict(run_row)
@@ -241,13 +416,12 @@ def get_run(run_id: int) -> Optional[Dict]:
     cursor.execute("""
         SELECT * FROM run_leads 
         WHERE run_id = ? 
-        ORDER BY created_at
+        ORDER BY position
     """, (run_id,))
     
-    leads = [dict(row) for row in cursor.fetchall()]
+    leads = [dict(row) for row in cursor]
     run['leads'] = leads
     
-    conn.close()
     return run
 
 
@@ -256,35 +430,32 @@ def get_all_runs(limit: int = 100, offset: int = 0, user_id: Optional[int] = Non
     conn = get_db_connection()
     cursor = conn.cursor()
     
+    # Lead counts are maintained on the runs row by create_run/update_run_selections,
+    # so there is no need to aggregate run_leads here
     if user_id:
         # Include runs for this user OR old runs without user_id (created before authentication)
         cursor.execute("""
             SELECT 
-                r.*,
-                COUNT(rl.id) as total_leads_count,
-                SUM(CASE WHEN rl.is_selected = 1 THEN 1 ELSE 0 END) as selected_leads_count
-            FROM runs r
-            LEFT JOIN run_leads rl ON r.id = rl.run_id
-            WHERE r.user_id = ? OR r.user_id IS NULL
-            GROUP BY r.id
-            ORDER BY r.created_at DESC
+                *,
+                total_leads as total_leads_count,
+                selected_leads as selected_leads_count
+            FROM runs
+            WHERE user_id = ? OR user_id IS NULL
+            ORDER BY created_at DESC
             LIMIT ? OFFSET ?
         """, (user_id, limit, offset))
     else:
         cursor.execute("""
             SELECT 
-                r.*,
-                COUNT(rl.id) as total_leads_count,
-                SUM(CASE WHEN rl.is_selected = 1 THEN 1 ELSE 0 END) as selected_leads_count
-            FROM runs r
-            LEFT JOIN run_leads rl ON r.id = rl.run_id
-            GROUP BY r.id
-            ORDER BY r.created_at DESC
+                *,
+                total_leads as total_leads_count,
+                selected_leads as selected_leads_count
+            FROM runs
+            ORDER BY created_at DESC
             LIMIT ? OFFSET ?
         """, (limit, offset))
     
-    runs = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+    runs = [dict(row) for row in cursor]
     return runs
 
 
@@ -297,17 +468,16 @@ def get_run_leads(run_id: int, selected_only: bool = False) -> List[Dict]:
         cursor.execute("""
             SELECT * FROM run_leads 
             WHERE run_id = ? AND is_selected = 1
-            ORDER BY created_at
+            ORDER BY position
         """, (run_id,))
     else:
         cursor.execute("""
             SELECT * FROM run_leads 
             WHERE run_id = ?
-            ORDER BY created_at
+            ORDER BY position
         """, (run_id,))
     
-    leads = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+    leads = [dict(row) for row in cursor]
     return leads
 
 
@@ -317,21 +487,28 @@ def update_run_selections(run_id: int, selected_lead_ids: List[str]) -> bool:
     cursor = conn.cursor()
     
     try:
-        # First, unselect all leads for this run
-        cursor.execute("""
-            UPDATE run_leads 
-            SET is_selected = 0 
-            WHERE run_id = ?
-        """, (run_id,))
+        cursor.execute("BEGIN IMMEDIATE")
         
-        # Then, mark the selected leads
+        # Set every lead's selection flag in a single pass
         if selected_lead_ids:
             placeholders = ','.join(['?'] * len(selected_lead_ids))
             cursor.execute(f"""
                 UPDATE run_leads 
-                SET is_selected = 1 
-                WHERE run_id = ? AND lead_id IN ({placeholders})
-            """, (run_id, *selected_lead_ids))
+                SET is_selected = CASE WHEN lead_id IN ({placeholders}) THEN 1 ELSE 0 END 
+                WHERE run_id = ?
+            """, (*selected_lead_ids, run_id))
+        else:
+            cursor.execute("""
+                UPDATE run_leads 
+                SET is_selected = 0 
+                WHERE run_id = ?
+            """, (run_id,))
+        
+        # Count the rows actually flagged - selected_lead_ids may hold duplicates or unknown ids
+        # (served by idx_run_leads_selected)
+        selected_count = cursor.execute("""
+            SELECT COUNT(*) FROM run_leads WHERE run_id = ? AND is_selected = 1
+        """, (run_id,)).fetchone()[0]
         
         # Update the selected_leads count in the runs table
         cursor.execute("""
@@ -339,19 +516,18 @@ def update_run_selections(run_id: int, selected_lead_ids: List[str]) -> bool:
             SET selected_leads = ?,
                 updated_at = CURRENT_TIMESTAMP
             WHERE id = ?
-        """, (len(selected_lead_ids), run_id))
+        """, (selected_count, run_id))
         
-        conn.commit()
         updated = cursor.rowcount > 0
-        conn.close()
+        cursor.execute("COMMIT")
         
         if updated:
-            print(f"[Database] Updated run {run_id} with {len(selected_lead_ids)} selected leads")
+            print(f"[Database] Updated run {run_id} with {selected_count} selected leads")
         
         return updated
     except Exception as e:
-        conn.rollback()
-        conn.close()
+        if conn.in_transaction:
+            cursor.execute("ROLLBACK")
         raise e
 
 
@@ -361,14 +537,14 @@ def delete_run(run_id: int) -> bool:
     cursor = conn.cursor()
     
     try:
+        cursor.execute("BEGIN IMMEDIATE")
         cursor.execute("DELETE FROM runs WHERE id = ?", (run_id,))
-        conn.commit()
         deleted = cursor.rowcount > 0
-        conn.close()
+        cursor.execute("COMMIT")
         return deleted
     except Exception as e:
-        conn.rollback()
-        conn.close()
+        if conn.in_transaction:
+            cursor.execute("ROLLBACK")
         raise e
 
 
@@ -394,8 +570,6 @@ def create_user(email: str, full_name: str, hashed_password: str) -> int:
     except Exception as e:
         conn.rollback()
         raise e
-    finally:
-        conn.close()
 
 
 def get_user_by_email(email: str) -> Optional[Dict]:
@@ -405,7 +579,6 @@ def get_user_by_email(email: str) -> Optional[Dict]:
     
     cursor.execute("SELECT * FROM users WHERE email = ?", (email,))
     row = cursor.fetchone()
-    conn.close()
     
     if row:
         return dict(row)
@@ -419,7 +592,6 @@ def get_user_by_id(user_id: int) -> Optional[Dict]:
     
     cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
     row = cursor.fetchone()
-    conn.close()
     
     if row:
         return dict(row)
@@ -441,7 +613,6 @@ def update_user(user_id: int, **kwargs) -> bool:
             values.append(value)
     
     if not updates:
-        conn.close()
         return False
     
     values.append(user_id)
@@ -453,10 +624,17 @@ def update_user(user_id: int, **kwargs) -> bool:
     
     conn.commit()
     updated = cursor.rowcount > 0
-    conn.close()
     return updated
 
 
-# Initialize database on import
-init_database()
+if __name__ == "__main__":
+    # Usage: python database.py init
+    import sys
+    if sys.argv[1:] == ["init"]:
+        init_database()
+    else:
+        print("Usage: python database.py init")
+else:
+    # Initialize database on import (skipped when the schema is already current)
+    _maybe_init()
 
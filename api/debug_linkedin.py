@@ -4,15 +4,14 @@ Debug script to see what's actually on the LinkedIn page
 import sys
 import os
 from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.firefox.service import Service
 from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.firefox.firefox_profile import FirefoxProfile
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.firefox import GeckoDriverManager
 import time
 
+from linkedin_scraper import get_geckodriver_service
+
 # Get Firefox profile path from environment variable
 FIREFOX_PROFILE_PATH = os.getenv('FIREFOX_PROFILE_PATH')
 
@@ -38,7 +37,8 @@ def debug_linkedin_page(url):
         options.profile = profile
         print(f"Using Firefox profile: {profile_path}\n")
     
-    service = Service(GeckoDriverManager().install())
+    # Reuses a geckodriver from PATH, the api folder or the webdriver-manager cache
+    service = get_geckodriver_service()
     driver = None
     
     try:
@@ -62,36 +62,42 @@ def debug_linkedin_page(url):
         print("SEARCHING FOR RESULTS LIST...")
         print("="*60)
         
+        # All probes run in the page via execute_script, so each step is a single
+        # WebDriver round-trip instead of one per selector/element
         selectors_to_try = [
-            ("Class: reusable-search__entity-result-list", By.CLASS_NAME, "reusable-search__entity-result-list"),
-            ("CSS: ul.reusable-search__entity-result-list", By.CSS_SELECTOR, "ul.reusable-search__entity-result-list"),
-            ("CSS: ul[class*='entity-result']", By.CSS_SELECTOR, "ul[class*='entity-result']"),
-            ("CSS: ul.search-results__list", By.CSS_SELECTOR, "ul.search-results__list"),
-            ("CSS: div.search-results", By.CSS_SELECTOR, "div.search-results"),
-            ("CSS: main[role='main']", By.CSS_SELECTOR, "main[role='main']"),
+            ("Class: reusable-search__entity-result-list", ".reusable-search__entity-result-list"),
+            ("CSS: ul.reusable-search__entity-result-list", "ul.reusable-search__entity-result-list"),
+            ("CSS: ul[class*='entity-result']", "ul[class*='entity-result']"),
+            ("CSS: ul.search-results__list", "ul.search-results__list"),
+            ("CSS: div.search-results", "div.search-results"),
+            ("CSS: main[role='main']", "main[role='main']"),
         ]
         
-        results_list = None
-        for name, by, selector in selectors_to_try:
-            try:
-                element = driver.find_element(by, selector)
+        match = driver.execute_script("""
+            const selectors = arguments[0];
+            for (let i = 0; i < selectors.length; i++) {
+                const element = document.querySelector(selectors[i]);
+                if (element) return [i, element];
+            }
+            return [selectors.length, null];
+        """, [selector for _, selector in selectors_to_try])
+        found_index, results_list = match
+        
+        for i, (name, _) in enumerate(selectors_to_try[:found_index + 1]):
+            if i == found_index:
                 print(f"✓ Found: {name}")
-                results_list = element
-                break
-            except:
+            else:
                 print(f"✗ Not found: {name}")
         
         if not results_list:
             print("\n⚠️ Could not find results list with any selector!")
             print("\nTrying to find ANY list elements...")
-            all_lists = driver.find_elements(By.TAG_NAME, "ul")
+            all_lists = driver.execute_script(
+                "return Array.from(document.getElementsByTagName('ul'), ul => ul.getAttribute('class'));"
+            )
             print(f"Found {len(all_lists)} <ul> elements on the page")
-            for i, ul in enumerate(all_lists[:5]):  # Show first 5
-                try:
-                    classes = ul.get_attribute("class")
-                    print(f"  UL {i+1}: class='{classes}'")
-                except:
-                    pass
+            for i, classes in enumerate(all_lists[:5]):  # Show first 5
+                print(f"  UL {i+1}: class='{classes}'")
         
         # If we found results list, check for items
         if results_list:
@@ -99,51 +105,53 @@ def debug_linkedin_page(url):
             print("SEARCHING FOR RESULT ITEMS...")
             print("="*60)
             
-            # Try to find list items
-            li_elements = results_list.find_elements(By.TAG_NAME, "li")
-            print(f"Found {len(li_elements)} <li> elements in results list")
+            name_selectors = [
+                ("Class: entity-result__title-text", ".entity-result__title-text"),
+                ("CSS: a[href*='/in/']", "a[href*='/in/']"),
+            ]
+            
+            # Collect counts and the first 3 items' name/link details in one call
+            summary = driver.execute_script("""
+                const list = arguments[0];
+                const nameSelectors = arguments[1];
+                const items = Array.from(list.getElementsByTagName('li'));
+                return {
+                    li_count: items.length,
+                    div_count: items.length ? 0 : list.getElementsByTagName('div').length,
+                    items: items.slice(0, 3).map(li => {
+                        let name = null;
+                        for (let i = 0; i < nameSelectors.length && !name; i++) {
+                            const el = li.querySelector(nameSelectors[i]);
+                            const text = el ? el.innerText.trim() : '';
+                            if (text) name = [i, text];
+                        }
+                        const links = Array.from(li.getElementsByTagName('a'))
+                            .map(a => a.href)
+                            .filter(href => href && href.includes('/in/'));
+                        return {name: name, links: links};
+                    })
+                };
+            """, results_list, [selector for _, selector in name_selectors])
+            
+            print(f"Found {summary['li_count']} <li> elements in results list")
             
-            if len(li_elements) == 0:
+            if summary['li_count'] == 0:
                 print("\n⚠️ No <li> elements found!")
                 print("Checking for other elements...")
-                all_divs = results_list.find_elements(By.TAG_NAME, "div")
-                print(f"Found {len(all_divs)} <div> elements in results list")
+                print(f"Found {summary['div_count']} <div> elements in results list")
             else:
                 print(f"\nAnalyzing first 3 result items...")
-                for i, li in enumerate(li_elements[:3]):
+                for i, item in enumerate(summary['items']):
                     print(f"\n--- Result Item {i+1} ---")
-                    try:
-                        # Try to find name
-                        name_selectors = [
-                            ("Class: entity-result__title-text", By.CLASS_NAME, "entity-result__title-text"),
-                            ("CSS: .entity-result__title-text", By.CSS_SELECTOR, ".entity-result__title-text"),
-                            ("CSS: a[href*='/in/']", By.CSS_SELECTOR, "a[href*='/in/']"),
-                        ]
-                        
-                        name_found = False
-                        for name_sel, by, selector in name_selectors:
-                            try:
-                                elem = li.find_element(by, selector)
-                                text = elem.text.strip()
-                                if text:
-                                    print(f"  Name ({name_sel}): {text}")
-                                    name_found = True
-                                    break
-                            except:
-                                pass
-                        
-                        if not name_found:
-                            print("  Name: NOT FOUND")
-                        
-                        # Try to find any links
-                        links = li.find_elements(By.TAG_NAME, "a")
-                        linkedin_links = [l for l in links if l.get_attribute("href") and "/in/" in l.get_attribute("href")]
-                        print(f"  LinkedIn profile links: {len(linkedin_links)}")
-                        if linkedin_links:
-                            print(f"  First link: {linkedin_links[0].get_attribute('href')}")
-                        
-                    except Exception as e:
-                        print(f"  Error analyzing item: {e}")
+                    if item['name']:
+                        name_index, text = item['name']
+                        print(f"  Name ({name_selectors[name_index][0]}): {text}")
+                    else:
+                        print("  Name: NOT FOUND")
+                    
+                    print(f"  LinkedIn profile links: {len(item['links'])}")
+                    if item['links']:
+                        print(f"  First link: {item['links'][0]}")
         
         # Take a screenshot for debugging
         screenshot_path = "linkedin_debug_screenshot.png"
@@ -7,13 +7,11 @@ Usage:
 """
 import sys
 import os
-import json
 import csv
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
-from linkedin_scraper import extract_names_only, extract_profile_links
-from utilities import save_to_json
+from utilities import write_json
 
 # Load environment variables from .env file
 # Look for .env in the api directory (where this script is located)
@@ -71,6 +69,9 @@ def main():
     print("="*60 + "\n")
     
     try:
+        # Imported here so the usage message doesn't pay for loading Selenium
+        from linkedin_scraper import extract_profile_links
+        
         # Extract profile links - more reliable than names
         links = extract_profile_links(
             search_url=linkedin_url,
@@ -93,12 +94,14 @@ def main():
                     if not output_dir.exists():
                         output_dir.mkdir()
                     
-                    # Create timestamp for filename
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    # Create timestamps once for the filenames and all output files
+                    now = datetime.now()
+                    timestamp = now.strftime("%Y%m%d_%H%M%S")
+                    extraction_date = now.isoformat()
                     
                     # Save as JSON
                     json_data = {
-                        "extraction_date": datetime.now().isoformat(),
+                        "extraction_date": extraction_date,
                         "linkedin_url": linkedin_url,
                         "max_results": max_results,
                         "max_pages": max_pages,
@@ -106,8 +109,7 @@ def main():
                         "profile_links": links
                     }
                     json_file = output_dir / f"profile_links_{timestamp}.json"
-                    with open(json_file, "w", encoding="utf-8") as f:
-                        json.dump(json_data, f, indent=2, ensure_ascii=False)
+                    write_json(json_data, json_file)
                     print(f"\n✓ Saved JSON to: {json_file}")
                     
                     # Save as CSV
@@ -115,15 +117,17 @@ def main():
                     with open(csv_file, "w", newline="", encoding="utf-8") as f:
                         writer = csv.writer(f)
                         writer.writerow(["#", "Profile URL", "Extraction Date", "Search URL"])
-                        for idx, link in enumerate(links, 1):
-                            writer.writerow([idx, link, datetime.now().isoformat(), linkedin_url])
+                        writer.writerows(
+                            (idx, link, extraction_date, linkedin_url)
+                            for idx, link in enumerate(links, 1)
+                        )
                     print(f"✓ Saved CSV to: {csv_file}")
                     
                     # Save as simple text file
                     txt_file = output_dir / f"profile_links_{timestamp}.txt"
                     with open(txt_file, "w", encoding="utf-8") as f:
                         f.write(f"LinkedIn Profile Link Extraction Results\n")
-                        f.write(f"Date: {datetime.now().isoformat()}\n")
+                        f.write(f"Date: {extraction_date}\n")
                         f.write(f"Search URL: {linkedin_url}\n")
                         f.write(f"Total Links: {len(links)}\n")
                         f.write(f"\n{'='*60}\n")
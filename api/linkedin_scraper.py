@@ -2,7 +2,9 @@
 LinkedIn Scraper using Selenium with Firefox
 Based on linkedin-bot functionality
 """
+import functools
 import os
+import re
 import uuid
 from datetime import datetime
 from typing import List, Dict, Optional
@@ -15,6 +17,7 @@ from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.firefox import GeckoDriverManager
 from webdriver_manager.chrome import ChromeDriverManager
 
@@ -29,10 +32,18 @@ PERSON_SECONDARY_SUBTITLE_CLASS = "entity-result__secondary-subtitle"
 PERSON_SUMMARY_CLASS = "entity-result__summary"
 BASE_LINKEDIN_URL = "https://www.linkedin.com"
 
+# Matches the login/challenge pages LinkedIn redirects signed-out sessions to
+LOGIN_REDIRECT_RE = re.compile(r"challenge|login", re.IGNORECASE)
 
-def get_geckodriver_service():
+# Matches webdriver-manager errors caused by GitHub API rate limiting
+RATE_LIMIT_ERROR_RE = re.compile(r"rate limit|429", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=None)
+def get_geckodriver_path() -> str:
     """
-    Get geckodriver service, handling GitHub API rate limits by using cached versions.
+    Resolve the geckodriver binary, handling GitHub API rate limits by using cached versions.
+    The path is looked up once per process; a failed lookup is retried on the next call.
     """
     import shutil
     import os
@@ -42,7 +53,7 @@ def get_geckodriver_service():
     geckodriver_path = shutil.which("geckodriver")
     if geckodriver_path:
         print(f"[Driver] Using geckodriver from PATH: {geckodriver_path}")
-        return Service(geckodriver_path)
+        return geckodriver_path
     
     # Try to find geckodriver in api folder
     try:
@@ -50,7 +61,7 @@ def get_geckodriver_service():
         geckodriver_exe = api_dir / ("geckodriver.exe" if os.name == 'nt' else "geckodriver")
         if geckodriver_exe.exists():
             print(f"[Driver] Using geckodriver from api folder: {geckodriver_exe}")
-            return Service(str(geckodriver_exe))
+            return str(geckodriver_exe)
     except:
         pass
     
@@ -65,15 +76,15 @@ def get_geckodriver_service():
                 geckodriver_exe = latest / ("geckodriver.exe" if os.name == 'nt' else "geckodriver")
                 if geckodriver_exe.exists():
                     print(f"[Driver] Using cached geckodriver: {geckodriver_exe}")
-                    return Service(str(geckodriver_exe))
+                    return str(geckodriver_exe)
     except:
         pass
     
     # Fallback: Try to download (may hit rate limit)
     try:
-        return Service(GeckoDriverManager().install())
+        return GeckoDriverManager().install()
     except Exception as e:
-        if "rate limit" in str(e).lower() or "429" in str(e) or "rate limit exceeded" in str(e).lower():
+        if RATE_LIMIT_ERROR_RE.search(str(e)):
             print("\n" + "="*60)
             print("⚠️ GITHUB API RATE LIMIT HIT")
             print("="*60)
@@ -88,6 +99,13 @@ def get_geckodriver_service():
         raise
 
 
+def get_geckodriver_service():
+    """
+    Get geckodriver service, handling GitHub API rate limits by using cached versions.
+    """
+    return Service(get_geckodriver_path())
+
+
 def get_chromedriver_service():
     """
     Get chromedriver service, handling download issues by using cached versions.
@@ -153,6 +171,23 @@ def get_chromedriver_service():
         raise
 
 
+def wait_for_search_page(driver, timeout: float = 10):
+    """
+    Wait until search results render or LinkedIn redirects to a login/challenge page,
+    instead of sleeping a fixed time after navigation.
+    """
+    def settled(d):
+        if LOGIN_REDIRECT_RE.search(d.current_url):
+            return True
+        return bool(d.find_elements(By.CSS_SELECTOR, f".{RESULTS_LIST_CLASS}, main a[href*='/in/']"))
+    
+    try:
+        WebDriverWait(driver, timeout).until(settled)
+    except TimeoutException:
+        # Let the caller's own checks report what's on the page
+        pass
+
+
 def scrape_linkedin_search(
     search_url: str,
     firefox_profile_path: Optional[str] = None,
@@ -228,7 +263,7 @@ def scrape_linkedin_search(
         
         # Navigate to search URL
         driver.get(search_url_full)
-        wait(4)
+        wait_for_search_page(driver)
         
         # Scroll to bottom to load pagination
         scroll_to_bottom(driver)
@@ -265,7 +300,7 @@ def scrape_linkedin_search(
                 else:
                     page_url = f"{BASE_LINKEDIN_URL}/search/results/people/?keywords={keywords}&origin=SWITCH_SEARCH_VERTICAL&sid=p%2CR&page={current_page}"
                 driver.get(page_url)
-                wait(2)
+                wait_for_search_page(driver)
             
             # Wait for results list to be present
             try:
@@ -281,6 +316,9 @@ def scrape_linkedin_search(
             # Get all `li` elements inside of the results list
             results = results_list.find_elements(By.TAG_NAME, "li")
             
+            # All leads on a page are captured together, so share one timestamp
+            page_created_at = datetime.now().isoformat()
+            
             # Iterate over results, get their information (matching original bot logic)
             for result in results:
                 if len(people) >= max_results:
@@ -337,7 +375,7 @@ def scrape_linkedin_search(
                     
                     # Create lead dictionary
                     person = {
-                        "id": str(uuid.uuid4()),
+                        "id": uuid.uuid4().hex,
                         "name": name,
                         "title": subtitle,
                         "company": secondary_subtitle,
@@ -347,7 +385,7 @@ def scrape_linkedin_search(
                         "linkedin_url": profile_url,
                         "email": None,
                         "profile_image": pfp,
-                        "created_at": datetime.now().isoformat(),
+                        "created_at": page_created_at,
                         "is_mock": False
                     }
                     
@@ -583,14 +621,14 @@ def extract_profile_links(
         # Navigate to search URL
         print(f"[Link Extractor] Navigating to: {search_url_full}")
         driver.get(search_url_full)
-        wait(5)  # Wait longer for page to load
+        wait_for_search_page(driver)
         
         # Verify we're on the right page
         current_url = driver.current_url
         print(f"[Link Extractor] Current URL after navigation: {current_url}")
         
         # Check if we need to login or if there's a redirect
-        if "challenge" in current_url.lower() or "login" in current_url.lower():
+        if LOGIN_REDIRECT_RE.search(current_url):
             print("[Link Extractor] ⚠️ Detected login/challenge page. You may need to log in manually.")
         
         # Scroll to bottom to load pagination
@@ -630,10 +668,10 @@ def extract_profile_links(
                 else:
                     page_url = f"{BASE_LINKEDIN_URL}/search/results/people/?keywords={keywords}&origin=SWITCH_SEARCH_VERTICAL&sid=p%2CR&page={current_page}"
                 driver.get(page_url)
-                wait(4)  # Wait longer for page to load
+                wait_for_search_page(driver)
                 
                 # Verify we're on the right page
-                if "challenge" in driver.current_url.lower() or "login" in driver.current_url.lower():
+                if LOGIN_REDIRECT_RE.search(driver.current_url):
                     print(f"[Link Extractor] ⚠️ Detected login/challenge page on page {current_page}")
             
             # Wait a bit and scroll to ensure content loads
@@ -797,14 +835,14 @@ def extract_profile_links_chrome(
         # Navigate to search URL
         print(f"[Chrome Link Extractor] Navigating to: {search_url_full}")
         driver.get(search_url_full)
-        wait(5)  # Wait longer for page to load
+        wait_for_search_page(driver)
         
         # Verify we're on the right page
         current_url = driver.current_url
         print(f"[Chrome Link Extractor] Current URL after navigation: {current_url}")
         
         # Check if we need to login or if there's a redirect
-        if "challenge" in current_url.lower() or "login" in current_url.lower():
+        if LOGIN_REDIRECT_RE.search(current_url):
             error_msg = "Detected login/challenge page. Make sure you're logged into LinkedIn in Chrome."
             print(f"[Chrome Link Extractor] ⚠️ {error_msg}")
             raise Exception(error_msg)
@@ -870,10 +908,10 @@ def extract_profile_links_chrome(
                 else:
                     page_url = f"{BASE_LINKEDIN_URL}/search/results/people/?keywords={keywords}&origin=SWITCH_SEARCH_VERTICAL&sid=p%2CR&page={current_page}"
                 driver.get(page_url)
-                wait(4)  # Wait longer for page to load
+                wait_for_search_page(driver)
                 
                 # Verify we're on the right page
-                if "challenge" in driver.current_url.lower() or "login" in driver.current_url.lower():
+                if LOGIN_REDIRECT_RE.search(driver.current_url):
                     print(f"[Chrome Link Extractor] ⚠️ Detected login/challenge page on page {current_page}")
             
             # Wait a bit and scroll to ensure content loads
@@ -932,7 +970,8 @@ def extract_profile_links_chrome(
                 if len(all_profile_links) == 0:
                     print("[Chrome Link Extractor] ⚠️ No profile links found. Checking page content...")
                     try:
-                        page_source_snippet = driver.page_source[:1000]
+                        # Slice in the browser so only the snippet crosses the WebDriver wire
+                        page_source_snippet = driver.execute_script("return document.documentElement.outerHTML.slice(0, 1000)")
                         print(f"[Chrome Link Extractor] Page source snippet (first 1000 chars): {page_source_snippet}")
                         
                         # Check if page has any links at all
@@ -1121,14 +1160,14 @@ def extract_names_only(
         # Navigate to search URL
         print(f"[Name Extractor] Navigating to: {search_url_full}")
         driver.get(search_url_full)
-        wait(5)  # Wait longer for page to load
+        wait_for_search_page(driver)
         
         # Verify we're on the right page
         current_url = driver.current_url
         print(f"[Name Extractor] Current URL after navigation: {current_url}")
         
         # Check if we need to login or if there's a redirect
-        if "challenge" in current_url.lower() or "login" in current_url.lower():
+        if LOGIN_REDIRECT_RE.search(current_url):
             print("[Name Extractor] ⚠️ Detected login/challenge page. You may need to log in manually.")
         
         # Scroll to bottom to load pagination
@@ -1168,10 +1207,10 @@ def extract_names_only(
                 else:
                     page_url = f"{BASE_LINKEDIN_URL}/search/results/people/?keywords={keywords}&origin=SWITCH_SEARCH_VERTICAL&sid=p%2CR&page={current_page}"
                 driver.get(page_url)
-                wait(4)  # Wait longer for page to load
+                wait_for_search_page(driver)
                 
                 # Verify we're on the right page
-                if "challenge" in driver.current_url.lower() or "login" in driver.current_url.lower():
+                if LOGIN_REDIRECT_RE.search(driver.current_url):
                     print(f"[Name Extractor] ⚠️ Detected login/challenge page on page {current_page}")
             
             # Wait a bit more and scroll to ensure content loads
@@ -1854,7 +1893,7 @@ def extract_names_only(
                 
                 # Debug: Print some HTML to see what's on the page
                 try:
-                    page_text = driver.page_source[:500]  # First 500 chars
+                    page_text = driver.execute_script("return document.documentElement.outerHTML.slice(0, 500)")  # First 500 chars
                     print(f"[Name Extractor] Page source preview: {page_text}...")
                 except:
                     pass
@@ -348,13 +348,6 @@ async def get_current_user_info(current_user: dict = Depends(get_current_user)):
     )
 
 
-# Cache for LinkedIn auth status (to avoid repeated browser launches)
-_linkedin_auth_cache = {
-    "result": None,
-    "timestamp": 0,
-    "ttl": 300  # Cache for 5 minutes (300 seconds)
-}
-
 # Store for bookmarklet status (shared across domains)
 # Status persists until user logs out (no time-based expiration)
 _bookmarklet_status_store = {
@@ -364,10 +357,8 @@ _bookmarklet_status_store = {
 }
 
 @app.get("/api/linkedin-auth-status")
-async def check_linkedin_auth_status():
-    """Check LinkedIn authentication status using Firefox profile (with caching)"""
-    import time
-    
+async def check_linkedin_auth_status(force: bool = False):
+    """Check LinkedIn authentication status using Firefox profile (with caching, unless force=true)"""
     firefox_profile_path = os.getenv('FIREFOX_PROFILE_PATH')
     
     if not firefox_profile_path:
@@ -378,16 +369,12 @@ async def check_linkedin_auth_status():
             "note": "Set FIREFOX_PROFILE_PATH environment variable with your Firefox profile path"
         }
     
-    # Check cache first
-    current_time = time.time()
-    if (_linkedin_auth_cache["result"] is not None and 
-        current_time - _linkedin_auth_cache["timestamp"] < _linkedin_auth_cache["ttl"]):
-        cached_result = _linkedin_auth_cache["result"].copy()
-        cached_result["cached"] = True
-        return cached_result
-    
     try:
-        from linkedin_auth_check import check_linkedin_auth_async
+        from linkedin_auth_check import check_linkedin_auth_async, clear_auth_cache
+        
+        # Results are cached by linkedin_auth_check until the profile's cookies change
+        if force:
+            clear_auth_cache()
         
         # Use headless mode for faster checks
         result = await check_linkedin_auth_async(
@@ -395,17 +382,15 @@ async def check_linkedin_auth_status():
             headless=True  # Use headless for speed
         )
         
-        # Update cache
-        _linkedin_auth_cache["result"] = result
-        _linkedin_auth_cache["timestamp"] = current_time
-        
         return result
         
     except Exception as e:
         error_msg = str(e)
         print(f"[API] Error checking LinkedIn auth: {error_msg}")
-        import traceback
-        traceback.print_exc()
+        # This endpoint is polled by the UI - only dump the stack when debugging
+        if os.getenv('LINKEDIN_DEBUG'):
+            import traceback
+            traceback.print_exc()
         
         return {
             "logged_in": None,
@@ -416,10 +401,10 @@ async def check_linkedin_auth_status():
 
 
 @app.get("/api/linkedin-login-status")
-async def check_linkedin_login_status():
+async def check_linkedin_login_status(force: bool = False):
     """Check LinkedIn login status (alias for linkedin-auth-status)"""
     # Use the same function as linkedin-auth-status
-    return await check_linkedin_auth_status()
+    return await check_linkedin_auth_status(force=force)
 
 
 class BookmarkletStatusRequest(BaseModel):
@@ -531,8 +516,9 @@ async def get_bookmarklet_status(logged_in: Optional[bool] = None, user_name: Op
 @app.post("/api/linkedin-auth-status/clear-cache")
 async def clear_linkedin_auth_cache():
     """Clear the LinkedIn auth status cache (force fresh check on next request)"""
-    _linkedin_auth_cache["result"] = None
-    _linkedin_auth_cache["timestamp"] = 0
+    from linkedin_auth_check import clear_auth_cache
+    
+    clear_auth_cache()
     return {
         "status": "success",
         "message": "Cache cleared. Next status check will be fresh."
@@ -936,7 +922,8 @@ async def export_leads(request: ExportRequest):
             )
         
         # Filter leads to only include selected ones
-        selected_leads = [lead for lead in request.leads if lead.id in request.selected_lead_ids]
+        selected_ids = set(request.selected_lead_ids)
+        selected_leads = [lead for lead in request.leads if lead.id in selected_ids]
         
         if not selected_leads:
             raise HTTPException(
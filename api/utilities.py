@@ -7,6 +7,11 @@ import json
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def wait(seconds: float):
     """
@@ -33,6 +38,18 @@ def prepare_output_structure():
     return output_dir
 
 
+def write_json(data, filename):
+    """
+    Writes data to a JSON file, using orjson when it is installed.
+    """
+    if orjson is not None:
+        with open(filename, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
 def save_to_json(data, output_dir: Path = None):
     """
     Saves the data to a JSON file.
@@ -44,8 +61,7 @@ def save_to_json(data, output_dir: Path = None):
     timestamp = now.strftime("%d-%m-%Y_%H-%M-%S")
     filename = output_dir / f"{timestamp}.json"
 
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+    write_json(data, filename)
 
     print(f"[Scraper] Saved data to {filename}")
     return filename